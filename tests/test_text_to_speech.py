@@ -7,12 +7,18 @@ Run with: pytest test_text_to_speech.py
 import pytest
 import tempfile
 import os
+import mmap
 from pathlib import Path
 from unittest.mock import patch, mock_open, MagicMock
-import unittest.mock
+import subprocess
 import sys
+import time
+import gc
+import weakref
+from concurrent.futures import ThreadPoolExecutor
 from io import StringIO
 import numpy as np
+import soundfile as sf
 
 # Import functions from the script
 from text_to_speech import (
@@ -21,8 +27,14 @@ from text_to_speech import (
     prepare_for_tts,
     split_sections,
     generate_audio,
+    load_tts_model,
+    _to_wav_array,
     list_available_voices,
-    concatenate_audio_files
+    concatenate_audio_files,
+    _prune_cache,
+    main,
+    CHUNK_PAUSE_MS,
+    SECTION_PAUSE_MS,
 )
 
 
@@ -55,6 +67,52 @@ class TestReadTextFile:
         finally:
             os.unlink(temp_path)
     
+    def test_read_utf8_bom_file(self):
+        """Test that a UTF-8 byte-order mark is stripped."""
+        content = "Hello, café"
+        with tempfile.NamedTemporaryFile(mode='wb', delete=False) as f:
+            f.write(content.encode('utf-8-sig'))
+            temp_path = f.name
+
+        try:
+            assert read_text_file(temp_path) == content
+        finally:
+            os.unlink(temp_path)
+
+    def test_read_utf16_bom_file(self):
+        """Test reading a UTF-16 file identified by its byte-order mark."""
+        content = "Hello, 世界"
+        with tempfile.NamedTemporaryFile(mode='wb', delete=False) as f:
+            f.write(content.encode('utf-16'))
+            temp_path = f.name
+
+        try:
+            assert read_text_file(temp_path) == content
+        finally:
+            os.unlink(temp_path)
+
+    @patch('text_to_speech._MMAP_MIN_BYTES', 0)
+    def test_large_files_are_memory_mapped(self, tmp_path):
+        """Test that files over the mmap threshold decode like small ones."""
+        for encoding, content in (("utf-8", "Hello, 世界\r\n"), ("utf-16", "Hello, 世界"),
+                                  ("utf-8-sig", "café"), ("latin-1", "crème")):
+            path = tmp_path / f"{encoding}.txt"
+            path.write_bytes(content.encode(encoding))
+            with patch('text_to_speech.mmap.mmap', wraps=mmap.mmap) as mock_mmap:
+                assert read_text_file(str(path)) == content.replace("\r\n", "\n")
+            mock_mmap.assert_called_once()
+
+    def test_read_crlf_file(self):
+        """Test that Windows line endings are normalized like text-mode reads."""
+        with tempfile.NamedTemporaryFile(mode='wb', delete=False) as f:
+            f.write(b"Line 1\r\nLine 2\rLine 3\n")
+            temp_path = f.name
+
+        try:
+            assert read_text_file(temp_path) == "Line 1\nLine 2\nLine 3\n"
+        finally:
+            os.unlink(temp_path)
+
     def test_read_nonexistent_file(self):
         """Test reading a file that doesn't exist."""
         with pytest.raises(FileNotFoundError):
@@ -128,24 +186,80 @@ class TestCleanMarkdownText:
         expected = "This is bold and italic text"
         assert clean_markdown_text(text) == expected
     
+    def test_remove_mixed_emphasis(self):
+        """Test removal of asterisk and underscore emphasis on the same line."""
+        text = "Both **bold** and _italic_ and *more*"
+        expected = "Both bold and italic and more"
+        assert clean_markdown_text(text) == expected
+
+    def test_remove_nested_emphasis(self):
+        """Test that nested emphasis styles are all stripped."""
+        text = "Both **_bold italic_** and __bold *italic* bold__"
+        expected = "Both bold italic and bold italic bold"
+        assert clean_markdown_text(text) == expected
+
+    def test_inline_code_keeps_emphasis_characters(self):
+        """Test that emphasis markers inside inline code are left as written."""
+        text = "Run `a*b*c` with **care**"
+        expected = "Run a*b*c with care"
+        assert clean_markdown_text(text) == expected
+
+    def test_bullet_marker_not_mistaken_for_emphasis(self):
+        """Test that a '* ' list marker doesn't pair with emphasis later on."""
+        text = "* Item with *emphasis*"
+        expected = "Item with emphasis"
+        assert clean_markdown_text(text) == expected
+
     def test_remove_code_blocks(self):
         """Test removal of code blocks."""
         text = "Before\n```python\nprint('hello')\n```\nAfter"
         expected = "Before\n\nAfter"
         assert clean_markdown_text(text) == expected
     
+    def test_remove_code_block_containing_backticks(self):
+        """Test that a fenced block is removed even if its body contains backticks."""
+        text = "Before\n```bash\necho `date`\n```\nAfter"
+        expected = "Before\n\nAfter"
+        assert clean_markdown_text(text) == expected
+
+    def test_emphasis_does_not_span_lines(self):
+        """Test that a stray asterisk doesn't pair with one on a later line."""
+        text = "Footnote*\nSecond line with a star*"
+        result = clean_markdown_text(text)
+        assert "Footnote*" in result
+        assert "star*" in result
+
+    def test_unmatched_emphasis_markers(self):
+        """Test that long runs of unmatched markers are left alone quickly."""
+        text = "a*" * 20000 + "\n" + "b_" * 20000
+        result = clean_markdown_text(text)
+        assert result.count("a") == 20000
+        assert result.count("b") == 20000
+
     def test_remove_inline_code(self):
         """Test removal of inline code."""
         text = "Use the `print()` function here"
         expected = "Use the print() function here"
         assert clean_markdown_text(text) == expected
     
+    def test_remove_inline_triple_backticks(self):
+        """Test that a fenced span within a line is stripped like inline code."""
+        text = "inline ```code``` here and ``more`` there"
+        expected = "inline code here and more there"
+        assert clean_markdown_text(text) == expected
+    
     def test_remove_lists(self):
         """Test removal of list formatting."""
         text = "- Item 1\n* Item 2\n+ Item 3\n1. Numbered item"
         expected = "Item 1\nItem 2\nItem 3\nNumbered item"
         assert clean_markdown_text(text) == expected
     
+    def test_remove_stacked_prefixes(self):
+        """Test that several prefixes on one line are all removed."""
+        text = "## 1. Introduction\n- > quoted item\n> - quoted list"
+        expected = "Introduction\nquoted item\nquoted list"
+        assert clean_markdown_text(text) == expected
+    
     def test_remove_blockquotes(self):
         """Test removal of blockquote formatting."""
         text = "> This is a quote\n> Multi-line quote"
@@ -158,6 +272,60 @@ class TestCleanMarkdownText:
         expected = "Line 1\n\nLine 2 with spaces"
         assert clean_markdown_text(text) == expected
     
+    def test_plain_prose_only_gets_whitespace_cleanup(self):
+        """Test that text with no markdown syntax is only whitespace-normalized."""
+        text = "  A well-known fact -- twenty-one   words.\n\n\n\nNext paragraph.  "
+        expected = "A well-known fact -- twenty-one words.\n\nNext paragraph."
+        assert clean_markdown_text(text) == expected
+
+    def test_large_document_matches_paragraph_cleaning(self):
+        """Test that large inputs are cleaned the same as their paragraphs."""
+        paragraph = "## Heading\n\nSome **bold** text with a [link](https://example.com)."
+        text = "\n\n".join([paragraph] * 2000)
+        assert len(text) > 50_000
+
+        expected = "\n\n".join([clean_markdown_text(paragraph)] * 2000)
+        assert clean_markdown_text(text) == expected
+
+    def test_large_document_with_unclosed_brackets(self):
+        """Test that many unclosed '[' in a large document don't scan the whole text."""
+        text = ("[" * 50 + " words\n\n") * 2000
+        result = clean_markdown_text(text)
+        assert result.count("words") == 2000
+
+    def test_unicode_blank_lines_collapse(self):
+        """Test that lines holding only non-ASCII whitespace count as blank."""
+        assert clean_markdown_text("One\n\u00a0\nTwo") == "One\n\nTwo"
+        assert clean_markdown_text("# One\n\u2003\nTwo") == "One\n\nTwo"
+
+    def test_emphasis_heavy_text_is_quiet_and_fast(self, capfd):
+        """Test that dense emphasis doesn't overflow the regex engine (re2 logs to stderr)."""
+        text = "Some *emph* and _under_ and **bold** `code` words. " * 4000 + "*a " * 20000
+
+        start = time.perf_counter()
+        result = clean_markdown_text(text)
+        assert time.perf_counter() - start < 2
+
+        assert "**" not in result
+        assert capfd.readouterr().err == ""
+
+    def test_single_large_paragraph_with_unclosed_links(self):
+        """Test that a huge paragraph of broken link syntax is cleaned quickly."""
+        for text in ('[a](' * 20000, '![' * 20000, '[' * 200000):
+            start = time.perf_counter()
+            result = clean_markdown_text(text)
+            assert time.perf_counter() - start < 2
+            assert len(result) == len(text)
+
+    def test_large_document_code_block_with_blank_lines(self):
+        """Test that a code block containing blank lines is removed from large inputs."""
+        filler = "Plain paragraph of prose.\n\n" * 3000
+        text = filler + "```python\nx = 1\n\ny = 2\n```\n\nAfter"
+        result = clean_markdown_text(text)
+        assert "x = 1" not in result
+        assert "y = 2" not in result
+        assert result.endswith("After")
+
     def test_preserve_phonetic_pronunciation_links(self):
         """Test that Kokoro phonetic pronunciation links are preserved during markdown cleaning."""
         text = "Say [Pengelley](/pˈɛndʒɛli/) correctly"
@@ -225,6 +393,57 @@ Regular text at the end."""
         assert "Regular text at the end." in result
 
 
+class TestMarkdownPatterns:
+    """Test that the cleaning patterns work with either regex engine."""
+
+    PATTERN_NAMES = [
+        "_MARKDOWN_CHARS_RE", "_CODE_BLOCK_RE", "_MARKUP_RE",
+        "_BLANK_LINES_RE", "_SPACES_RE",
+    ]
+    # The patterns compiled with re2 when it is installed
+    ENGINE_PATTERN_NAMES = [
+        "_MARKDOWN_CHARS_RE", "_CODE_BLOCK_RE",
+    ]
+
+    @pytest.mark.parametrize("name", PATTERN_NAMES)
+    def test_pattern_compiles_with_re(self, name):
+        """Test that each pattern is valid for the standard re module."""
+        import re
+        import text_to_speech
+        re.compile(getattr(text_to_speech, name).pattern)
+
+    @pytest.mark.parametrize("text", ['[a](' * 20000, '![' * 20000, '[' * 200000])
+    def test_link_patterns_fail_fast_with_re(self, text):
+        """Test that unclosed link syntax doesn't backtrack badly with the standard re module."""
+        import re
+        import text_to_speech
+        start = time.perf_counter()
+        re.compile(text_to_speech._MARKUP_RE.pattern).sub('', text)
+        assert time.perf_counter() - start < 2
+
+    @pytest.mark.parametrize("name", ENGINE_PATTERN_NAMES)
+    def test_pattern_compiles_with_re2(self, name):
+        """Test that each pattern stays within RE2's linear-time syntax."""
+        re2 = pytest.importorskip("re2")
+        import text_to_speech
+        re2.compile(getattr(text_to_speech, name).pattern)
+
+    @pytest.mark.parametrize("name", ENGINE_PATTERN_NAMES)
+    def test_re_and_re2_agree(self, name):
+        """Test that both engines strip the same text, including non-ASCII digits and spaces."""
+        import re
+        re2 = pytest.importorskip("re2")
+        import text_to_speech
+        pattern = getattr(text_to_speech, name).pattern
+        samples = [
+            "# Title\n\n1. one\n\u0661. two\n> quote\n- item\n\u00a0- nbsp item",
+            "![alt](pic.png) and ![\u00e9t\u00e9](/x/) text",
+            "```py\ncode\n\n```\nafter ```inline```",
+        ]
+        for text in samples:
+            assert re2.compile(pattern).sub('', text) == re.compile(pattern).sub('', text)
+
+
 class TestPrepareForTTS:
     """Test the prepare_for_tts function."""
 
@@ -278,52 +497,117 @@ class TestSplitSections:
 class TestConcatenateWithSectionPauses:
     """Test concatenation with section-level pauses."""
 
-    @patch('text_to_speech.AudioSegment')
-    def test_section_boundaries_get_longer_pause(self, mock_audio_segment):
+    def test_section_boundaries_get_longer_pause(self, tmp_path):
         """Test that section boundaries use a longer pause than intra-section chunks."""
-        audio_files = ["chunk1.wav", "chunk2.wav", "chunk3.wav"]
-        section_breaks = {1}  # Break after chunk index 1
+        audio_files = []
+        for i in range(3):
+            path = str(tmp_path / f"chunk{i}.wav")
+            sf.write(path, np.full(100, 0.5, dtype=np.float32), 24000)
+            audio_files.append(path)
+        output_path = str(tmp_path / "output.wav")
+
+        concatenate_audio_files(audio_files, output_path, section_breaks={1})
+
+        data, sr = sf.read(output_path)
+        chunk_gap = sr * CHUNK_PAUSE_MS // 1000
+        section_gap = sr * SECTION_PAUSE_MS // 1000
+        assert len(data) == 300 + chunk_gap + section_gap
+        # The gap after chunk index 1 is the long one
+        second_gap_start = 100 + chunk_gap + 100
+        assert np.all(data[second_gap_start:second_gap_start + section_gap] == 0)
+        assert data[second_gap_start + section_gap] != 0
 
-        concatenate_audio_files(audio_files, "output.wav", section_breaks=section_breaks)
 
-        silent_calls = mock_audio_segment.silent.call_args_list
-        durations = [call.kwargs.get('duration', call.args[0] if call.args else None)
-                     for call in silent_calls]
-        # Should have at least one call with duration > 300 (the section break)
-        assert any(d is not None and d > 300 for d in durations)
+class TestToWavArray:
+    """Test the _to_wav_array helper."""
+
+    def test_converts_to_flat_float32(self):
+        """Test that nested or float64 input becomes a 1-D float32 array."""
+        result = _to_wav_array([[0.0, 0.5], [-0.5, 1.0]])
+        assert result.dtype == np.float32
+        assert result.shape == (4,)
+        assert result.flags['C_CONTIGUOUS']
+
+    def test_float32_input_is_not_copied(self):
+        """Test that a float32 numpy array is passed through without a copy."""
+        audio = np.zeros(100, dtype=np.float32)
+        assert np.shares_memory(_to_wav_array(audio), audio)
+
+
+class TestLoadTtsModel:
+    """Test the load_tts_model function."""
+
+    def test_model_is_loaded_once_per_name(self):
+        """Test that repeated loads of the same model reuse one instance."""
+        load_model = MagicMock(side_effect=lambda name: MagicMock(name=name))
+        utils = MagicMock(load_model=load_model)
+        load_tts_model.cache_clear()
+        try:
+            with patch.dict(sys.modules, {
+                "mlx_audio": MagicMock(), "mlx_audio.tts": MagicMock(), "mlx_audio.tts.utils": utils,
+            }):
+                first = load_tts_model("mlx-community/Kokoro-82M-bf16")
+                assert load_tts_model("mlx-community/Kokoro-82M-bf16") is first
+                assert load_tts_model("mlx-community/Kokoro-82M-8bit") is not first
+        finally:
+            load_tts_model.cache_clear()
+
+        assert load_model.call_count == 2
 
 
 class TestGenerateAudio:
     """Test the generate_audio function."""
 
-    @patch('text_to_speech.concatenate_audio_files')
-    @patch('text_to_speech.sf')
-    @patch('text_to_speech.load_model')
-    def test_generates_wav_output(self, mock_load_model, mock_sf, mock_concat, tmp_path):
-        """Test that generate_audio produces a WAV file."""
+    @staticmethod
+    def _mock_model(mock_load_model, *chunk_lengths):
+        """Make load_tts_model return a model that yields chunks of the given lengths."""
         mock_model = MagicMock()
         mock_load_model.return_value = mock_model
-        mock_result = MagicMock()
-        mock_result.audio = [0.0, 0.1, 0.2]
-        mock_model.generate.return_value = [mock_result]
+        results = []
+        for length in chunk_lengths:
+            result = MagicMock()
+            result.audio = np.full(length, 0.5, dtype=np.float32)
+            results.append(result)
+        mock_model.generate.side_effect = lambda **kwargs: iter(results)
+        return mock_model
+
+    @patch('text_to_speech.load_tts_model')
+    def test_generates_wav_output(self, mock_load_model, tmp_path):
+        """Test that generate_audio produces a WAV file."""
+        mock_model = self._mock_model(mock_load_model, 100)
 
         output_path = str(tmp_path / "output.wav")
         generate_audio("Hello world.", output_path)
 
         mock_load_model.assert_called_once()
         mock_model.generate.assert_called_once()
-        mock_concat.assert_called_once()
+        data, sr = sf.read(output_path)
+        assert sr == 24000
+        assert len(data) == 100  # no pause after the last chunk
 
-    @patch('text_to_speech.concatenate_audio_files')
-    @patch('text_to_speech.sf')
-    @patch('text_to_speech.load_model')
-    def test_passes_voice_and_speed(self, mock_load_model, mock_sf, mock_concat, tmp_path):
+    @patch('text_to_speech.load_tts_model')
+    def test_rejects_text_with_nothing_to_speak(self, mock_load_model, tmp_path):
+        """Test that punctuation-only text is an error raised before the model loads."""
+        with pytest.raises(ValueError, match="no readable text"):
+            generate_audio("-- ... --\n\n[BREAK]\n\n*", str(tmp_path / "output.wav"))
+
+        mock_load_model.assert_not_called()
+
+    @patch('text_to_speech.load_tts_model')
+    def test_reports_progress_per_chunk(self, mock_load_model, tmp_path, capsys):
+        """Test that progress is printed as each chunk is generated."""
+        self._mock_model(mock_load_model, 24000, 12000)
+
+        generate_audio("Hello.", str(tmp_path / "output.wav"))
+
+        out = capsys.readouterr().out
+        assert "Generated chunk 1 (1s of audio so far)" in out
+        assert "Generated chunk 2 (2s of audio so far)" in out
+
+    @patch('text_to_speech.load_tts_model')
+    def test_passes_voice_and_speed(self, mock_load_model, tmp_path):
         """Test that voice and speed parameters are forwarded to the model."""
-        mock_model = MagicMock()
-        mock_load_model.return_value = mock_model
-        mock_result = MagicMock()
-        mock_result.audio = [0.0]
-        mock_model.generate.return_value = [mock_result]
+        mock_model = self._mock_model(mock_load_model, 10)
 
         output_path = str(tmp_path / "output.wav")
         generate_audio("Hello.", output_path, voice="af_bella", speed=1.2, lang="b")
@@ -333,26 +617,282 @@ class TestGenerateAudio:
         assert call_kwargs["speed"] == 1.2
         assert call_kwargs["lang_code"] == "b"
 
-    @patch('text_to_speech.concatenate_audio_files')
-    @patch('text_to_speech.sf')
-    @patch('text_to_speech.load_model')
-    def test_handles_section_breaks(self, mock_load_model, mock_sf, mock_concat, tmp_path):
-        """Test that [BREAK] markers result in section breaks during concatenation."""
-        mock_model = MagicMock()
-        mock_load_model.return_value = mock_model
-        mock_result = MagicMock()
-        mock_result.audio = [0.0]
-        mock_model.generate.return_value = [mock_result]
+    @patch('text_to_speech.load_tts_model')
+    def test_handles_section_breaks(self, mock_load_model, tmp_path):
+        """Test that [BREAK] markers result in a section pause between sections."""
+        mock_model = self._mock_model(mock_load_model, 100)
 
         output_path = str(tmp_path / "output.wav")
         generate_audio("Section one.\n\n[BREAK]\n\nSection two.", output_path)
 
         # Model should be called twice (once per section)
         assert mock_model.generate.call_count == 2
-        # Concatenation should receive section_breaks
-        concat_kwargs = mock_concat.call_args.kwargs
-        assert "section_breaks" in concat_kwargs
-        assert len(concat_kwargs["section_breaks"]) == 1
+        data, sr = sf.read(output_path)
+        section_gap = sr * SECTION_PAUSE_MS // 1000
+        assert len(data) == 200 + section_gap
+        assert np.all(data[100:100 + section_gap] == 0)
+        assert data[100 + section_gap] != 0
+
+    @patch('soundfile.write')
+    @patch('text_to_speech.load_tts_model')
+    def test_chunks_stream_without_temp_files(self, mock_load_model, mock_sf_write, tmp_path):
+        """Test that chunks go straight to the output file without temp files."""
+        self._mock_model(mock_load_model, 50, 70)
+
+        output_path = str(tmp_path / "output.wav")
+        generate_audio("Hello.", output_path)
+
+        mock_sf_write.assert_not_called()
+        data, sr = sf.read(output_path)
+        assert len(data) == 120 + sr * CHUNK_PAUSE_MS // 1000
+
+    @patch('text_to_speech.load_tts_model')
+    def test_chunk_pause_is_configurable(self, mock_load_model, tmp_path):
+        """Test that chunk_pause_ms sets the gap between chunks, and 0 removes it."""
+        self._mock_model(mock_load_model, 50, 70)
+
+        for pause_ms in (0, 100):
+            output_path = str(tmp_path / f"output{pause_ms}.wav")
+            generate_audio("Hello.", output_path, chunk_pause_ms=pause_ms)
+
+            data, sr = sf.read(output_path)
+            assert len(data) == 120 + sr * pause_ms // 1000
+
+    @patch('text_to_speech.load_tts_model')
+    def test_no_audio_leaves_no_output_file(self, mock_load_model, tmp_path):
+        """Test that a model producing nothing raises without creating the file."""
+        self._mock_model(mock_load_model)
+
+        output_path = tmp_path / "output.wav"
+        with pytest.raises(RuntimeError, match="No audio was generated"):
+            generate_audio("Hello.", str(output_path))
+
+        assert not output_path.exists()
+
+    @patch('text_to_speech.load_tts_model')
+    def test_failure_mid_stream_removes_partial_file(self, mock_load_model, tmp_path):
+        """Test that an error after some chunks were written removes the output."""
+        mock_model = MagicMock()
+        mock_load_model.return_value = mock_model
+        result = MagicMock()
+        result.audio = np.zeros(10, dtype=np.float32)
+
+        def failing_generate(**kwargs):
+            yield result
+            raise RuntimeError("model crashed")
+
+        mock_model.generate.side_effect = failing_generate
+
+        output_path = tmp_path / "output.wav"
+        with pytest.raises(RuntimeError, match="model crashed"):
+            generate_audio("Hello.", str(output_path))
+
+        assert not output_path.exists()
+
+    @patch('text_to_speech.load_tts_model')
+    def test_keep_temp_writes_chunk_files(self, mock_load_model, tmp_path, capsys):
+        """Test that keep_temp dumps each chunk to a WAV file and reports where."""
+        self._mock_model(mock_load_model, 10, 10)
+
+        generate_audio("Hello.", str(tmp_path / "output.wav"), keep_temp=True)
+
+        out = capsys.readouterr().out
+        temp_dir = out.split("Chunk files kept in: ")[1].strip()
+        try:
+            assert sorted(os.listdir(temp_dir)) == ["chunk_0000.wav", "chunk_0001.wav"]
+        finally:
+            for name in os.listdir(temp_dir):
+                os.unlink(os.path.join(temp_dir, name))
+            os.rmdir(temp_dir)
+
+    @patch('soundfile.write')
+    @patch('text_to_speech.load_tts_model')
+    def test_keep_temp_write_error_only_warns(self, mock_load_model, mock_write, tmp_path, capsys):
+        """Test that a failed chunk dump doesn't fail a run whose output was written."""
+        self._mock_model(mock_load_model, 10, 10)
+        mock_write.side_effect = OSError("disk full")
+
+        output_path = tmp_path / "output.wav"
+        generate_audio("Hello.", str(output_path), keep_temp=True)
+
+        assert output_path.exists()
+        captured = capsys.readouterr()
+        assert "Warning: 2 of 2 chunk files could not be written (disk full)" in captured.err
+        os.rmdir(captured.out.split("Chunk files kept in: ")[1].strip())
+
+
+class TestAudioCache:
+    """Test generate_audio's per-paragraph cache."""
+
+    @patch('text_to_speech.load_tts_model')
+    def test_cached_paragraphs_skip_the_model(self, mock_load_model, tmp_path):
+        """Test that a second run with the same settings reuses the cached audio."""
+        mock_model = TestGenerateAudio._mock_model(mock_load_model, 40, 60)
+        cache_dir = str(tmp_path / "cache")
+        text = "First paragraph.\n\nSecond paragraph."
+
+        generate_audio(text, str(tmp_path / "first.wav"), cache_dir=cache_dir)
+        assert mock_model.generate.call_count == 2  # once per paragraph
+        assert len(os.listdir(cache_dir)) == 2
+
+        mock_load_model.reset_mock()
+        generate_audio(text, str(tmp_path / "second.wav"), cache_dir=cache_dir)
+
+        mock_load_model.assert_not_called()
+        first, _ = sf.read(str(tmp_path / "first.wav"))
+        second, _ = sf.read(str(tmp_path / "second.wav"))
+        assert np.array_equal(first, second)
+
+    @patch('text_to_speech.load_tts_model')
+    def test_failed_cache_write_only_warns(self, mock_load_model, tmp_path, capsys):
+        """Test that a cache write error keeps the output and leaves no temp file."""
+        TestGenerateAudio._mock_model(mock_load_model, 40)
+        cache_dir = tmp_path / "cache"
+        output_path = tmp_path / "out.wav"
+
+        def full_disk(path, *args, **kwargs):
+            Path(path).write_bytes(b"RIFF")  # a partial write
+            raise OSError("disk full")
+
+        with patch('soundfile.write', side_effect=full_disk):
+            generate_audio("Hello.", str(output_path), cache_dir=str(cache_dir))
+
+        assert len(sf.read(str(output_path))[0]) == 40
+        assert os.listdir(cache_dir) == []
+        assert "could not be updated for 1 paragraph(s) (disk full)" in capsys.readouterr().err
+
+    @patch('text_to_speech.load_tts_model')
+    def test_unusable_cache_dir_only_warns(self, mock_load_model, tmp_path, capsys):
+        """Test that a cache directory that can't be created just disables the cache."""
+        TestGenerateAudio._mock_model(mock_load_model, 40)
+        blocker = tmp_path / "not_a_dir"
+        blocker.write_text("")
+        output_path = tmp_path / "out.wav"
+
+        generate_audio("Hello.", str(output_path), cache_dir=str(blocker / "cache"))
+
+        assert len(sf.read(str(output_path))[0]) == 40
+        assert "Warning: not caching" in capsys.readouterr().err
+
+    @patch('text_to_speech.load_tts_model')
+    def test_settings_are_part_of_the_key(self, mock_load_model, tmp_path):
+        """Test that a different voice doesn't reuse another voice's audio."""
+        mock_model = TestGenerateAudio._mock_model(mock_load_model, 40)
+        cache_dir = str(tmp_path / "cache")
+
+        generate_audio("Hello.", str(tmp_path / "a.wav"), voice="af_heart", cache_dir=cache_dir)
+        generate_audio("Hello.", str(tmp_path / "b.wav"), voice="af_bella", cache_dir=cache_dir)
+
+        assert mock_model.generate.call_count == 2
+        assert len(os.listdir(cache_dir)) == 2
+
+    @patch('text_to_speech.load_tts_model')
+    def test_model_is_part_of_the_key(self, mock_load_model, tmp_path):
+        """Test that each model keeps its own cache entries."""
+        mock_model = TestGenerateAudio._mock_model(mock_load_model, 40)
+        cache_dir = str(tmp_path / "cache")
+
+        generate_audio("Hello.", str(tmp_path / "a.wav"), cache_dir=cache_dir)
+        generate_audio(
+            "Hello.", str(tmp_path / "b.wav"), cache_dir=cache_dir,
+            model_name="mlx-community/Kokoro-82M-8bit",
+        )
+
+        assert mock_model.generate.call_count == 2
+        mock_load_model.assert_called_with("mlx-community/Kokoro-82M-8bit")
+
+    def test_prune_removes_least_recently_used(self, tmp_path):
+        """Test that eviction starts with the entries used longest ago."""
+        for i, name in enumerate(["old.wav", "middle.wav", "new.wav"]):
+            path = tmp_path / name
+            path.write_bytes(b"x" * 100)
+            os.utime(path, (1000 + i, 1000 + i))
+
+        _prune_cache(str(tmp_path), 250)
+
+        assert sorted(os.listdir(tmp_path)) == ["middle.wav", "new.wav"]
+
+
+class TestWorkers:
+    """Test generating paragraphs in worker processes."""
+
+    @patch('text_to_speech.ProcessPoolExecutor', ThreadPoolExecutor)  # mocks don't cross processes
+    @patch('text_to_speech.load_tts_model')
+    def test_workers_match_single_process_output(self, mock_load_model, tmp_path):
+        """Test that fanning paragraphs out to workers writes the same audio, in order."""
+        mock_model = MagicMock()
+        mock_load_model.return_value = mock_model
+
+        def generate(text, **kwargs):
+            # Like Kokoro, one result per line of input
+            for line in text.split("\n"):
+                if line.strip():
+                    result = MagicMock()
+                    result.audio = np.full(10 * len(line), 0.5, dtype=np.float32)
+                    yield result
+        mock_model.generate.side_effect = generate
+        text = "One.\nTwo two.\n\n[BREAK]\n\nThree three three."
+
+        generate_audio(text, str(tmp_path / "single.wav"))
+        generate_audio(text, str(tmp_path / "workers.wav"), workers=3)
+
+        single, _ = sf.read(str(tmp_path / "single.wav"))
+        workers, _ = sf.read(str(tmp_path / "workers.wav"))
+        assert np.array_equal(single, workers)
+        mock_load_model.assert_called_with("mlx-community/Kokoro-82M-bf16")
+
+    @patch('text_to_speech.ProcessPoolExecutor', ThreadPoolExecutor)
+    @patch('text_to_speech.load_tts_model')
+    def test_written_results_are_released(self, mock_load_model, tmp_path):
+        """Test that only a bounded window of paragraph results is held in memory."""
+        generated = []
+
+        def generate(text, **kwargs):
+            audio = np.full(10, 0.5, dtype=np.float32)
+            generated.append(weakref.ref(audio))
+            result = MagicMock()
+            result.audio = audio
+            yield result
+        mock_load_model.return_value.generate.side_effect = generate
+
+        held = []
+
+        def write_wav_stream(sections, output_path, chunk_pause_ms):
+            for section in sections:
+                for audio in section:
+                    del audio
+                    gc.collect()
+                    held.append(sum(ref() is not None for ref in generated))
+
+        text = "\n".join(f"Paragraph {i}." for i in range(50))
+        with patch('text_to_speech.write_wav_stream', write_wav_stream):
+            generate_audio(text, str(tmp_path / "out.wav"), workers=2)
+
+        assert len(held) == 50
+        assert max(held) <= 2 * 2 + 1  # the window plus the chunk being written
+
+    def test_workers_must_be_positive(self, tmp_path):
+        """Test that --workers 0 is rejected."""
+        input_file = tmp_path / "one.txt"
+        input_file.write_text("Hello.")
+
+        with pytest.raises(SystemExit) as exc_info:
+            main([str(input_file), "--workers", "0"])
+
+        assert exc_info.value.code == 1
+
+    @patch('text_to_speech.load_tts_model')
+    def test_workers_with_daemon_is_rejected(self, mock_load, tmp_path, capsys):
+        """Test that --workers isn't silently dropped when the job goes to the server."""
+        input_file = tmp_path / "one.txt"
+        input_file.write_text("Hello.")
+
+        with pytest.raises(SystemExit) as exc_info:
+            main([str(input_file), "--workers", "2", "--use-daemon"])
+
+        assert exc_info.value.code == 1
+        assert "--workers can't be combined with --use-daemon" in capsys.readouterr().err
+        mock_load.assert_not_called()
 
 
 class TestListAvailableVoices:
@@ -377,41 +917,197 @@ class TestListAvailableVoices:
 
 class TestConcatenateAudioFiles:
     """Test the concatenate_audio_files function."""
-    
-    @patch('text_to_speech.AudioSegment')
-    def test_concatenate_audio_files_calls_correct_methods(self, mock_audio_segment):
-        """Test that concatenate_audio_files calls the expected AudioSegment methods."""
-        audio_files = ["file1.wav", "file2.wav", "file3.wav"]
-        output_path = "output.wav"
-        
+
+    def test_concatenate_wav_files(self, tmp_path):
+        """Test that WAV files are decoded and joined with pauses."""
+        audio_files = []
+        for i in range(3):
+            path = str(tmp_path / f"file{i}.wav")
+            sf.write(path, np.full(100, 0.5, dtype=np.float32), 24000)
+            audio_files.append(path)
+        output_path = str(tmp_path / "output.wav")
+
         concatenate_audio_files(audio_files, output_path)
-        
-        # Verify AudioSegment.from_wav was called for each file
-        assert mock_audio_segment.from_wav.call_count == 3
-        expected_calls = [
-            unittest.mock.call("file1.wav"),
-            unittest.mock.call("file2.wav"), 
-            unittest.mock.call("file3.wav")
-        ]
-        mock_audio_segment.from_wav.assert_has_calls(expected_calls)
-        
-        # Verify empty() and silent() were called
-        mock_audio_segment.empty.assert_called_once()
-        # silent() is called for each gap between files
-        assert mock_audio_segment.silent.call_count >= 1
-    
+
+        data, sr = sf.read(output_path)
+        assert len(data) == 300 + 2 * (sr * CHUNK_PAUSE_MS // 1000)
+
+    def test_many_files_keep_their_order(self, tmp_path):
+        """Test that files decoded ahead in parallel are still written in order."""
+        audio_files = []
+        for i in range(25):
+            path = str(tmp_path / f"file{i}.wav")
+            sf.write(path, np.full(10, i / 50, dtype=np.float32), 24000)
+            audio_files.append(path)
+        output_path = str(tmp_path / "output.wav")
+
+        concatenate_audio_files(audio_files, output_path, section_breaks={9})
+
+        data, sr = sf.read(output_path)
+        chunk_gap = sr * CHUNK_PAUSE_MS // 1000
+        section_gap = sr * SECTION_PAUSE_MS // 1000
+        starts = [i * (10 + chunk_gap) + (section_gap - chunk_gap) * (i > 9) for i in range(25)]
+        assert [round(data[start] * 50) for start in starts] == list(range(25))
+
     def test_concatenate_empty_list(self):
         """Test error handling for empty audio file list."""
         with pytest.raises(ValueError, match="No audio files to concatenate"):
             concatenate_audio_files([], "output.wav")
-    
-    @patch('text_to_speech.AudioSegment')
-    def test_concatenate_single_file_calls_methods(self, mock_audio_segment):
-        """Test concatenation with a single file calls expected methods."""
-        concatenate_audio_files(["single.wav"], "output.wav")
-        
-        mock_audio_segment.from_wav.assert_called_once_with("single.wav")
-        mock_audio_segment.empty.assert_called_once()
+
+
+class TestCLI:
+    """Test the command-line entry point."""
+
+    @patch('text_to_speech.generate_audio')
+    @patch('text_to_speech.load_tts_model')
+    def test_multiple_files_share_one_model(self, mock_load, mock_generate, tmp_path):
+        """Test that several inputs are converted with a single model load."""
+        first = tmp_path / "one.txt"
+        second = tmp_path / "two.md"
+        first.write_text("First file.")
+        second.write_text("# Second file")
+
+        main([str(first), str(second)])
+
+        mock_load.assert_called_once()
+        outputs = [call.args[1] for call in mock_generate.call_args_list]
+        assert outputs == [str(tmp_path / "one.wav"), str(tmp_path / "two.wav")]
+        for call in mock_generate.call_args_list:
+            assert call.kwargs["model"] is mock_load.return_value
+        # Markdown is detected per file
+        assert mock_generate.call_args_list[1].args[0] == "Second file"
+
+    @patch('text_to_speech.generate_audio')
+    @patch('text_to_speech.load_tts_model')
+    def test_merge_joins_files_with_section_breaks(self, mock_load, mock_generate, tmp_path):
+        """Test that --merge produces one recording with a [BREAK] between files."""
+        first = tmp_path / "one.txt"
+        second = tmp_path / "two.txt"
+        first.write_text("First file.")
+        second.write_text("Second file.")
+        output = str(tmp_path / "book.wav")
+
+        main([str(first), str(second), "--merge", "--output", output])
+
+        mock_generate.assert_called_once()
+        text, output_path = mock_generate.call_args.args
+        assert text == "First file.\n\n[BREAK]\n\nSecond file."
+        assert output_path == output
+
+    @patch('text_to_speech.generate_audio')
+    @patch('text_to_speech.load_tts_model')
+    def test_model_option_selects_model(self, mock_load, mock_generate, tmp_path):
+        """Test that --model picks which model is loaded."""
+        input_file = tmp_path / "one.txt"
+        input_file.write_text("Hello.")
+
+        main([str(input_file), "--model", "mlx-community/Kokoro-82M-8bit"])
+
+        mock_load.assert_called_once_with("mlx-community/Kokoro-82M-8bit")
+        assert mock_generate.call_args.kwargs["model_name"] == "mlx-community/Kokoro-82M-8bit"
+
+    @patch('text_to_speech.generate_audio')
+    @patch('text_to_speech.load_tts_model')
+    def test_workers_option_reaches_generate_audio(self, mock_load, mock_generate, tmp_path):
+        """Test that --workers is passed on, leaving the model loads to the workers."""
+        input_file = tmp_path / "one.txt"
+        input_file.write_text("Hello.")
+
+        main([str(input_file), "--workers", "3"])
+
+        mock_load.assert_not_called()
+        assert mock_generate.call_args.kwargs["workers"] == 3
+
+    @patch('text_to_speech.generate_audio')
+    @patch('text_to_speech.load_tts_model')
+    def test_chunk_pause_option_reaches_generate_audio(self, mock_load, mock_generate, tmp_path):
+        """Test that --chunk-pause-ms is passed on, and negative values are rejected."""
+        input_file = tmp_path / "one.txt"
+        input_file.write_text("Hello.")
+
+        main([str(input_file), "--chunk-pause-ms", "0"])
+        assert mock_generate.call_args.kwargs["chunk_pause_ms"] == 0
+
+        with pytest.raises(SystemExit):
+            main([str(input_file), "--chunk-pause-ms", "-5"])
+
+    @patch('text_to_speech.generate_audio')
+    @patch('text_to_speech.load_tts_model')
+    def test_cache_leaves_model_load_to_generate_audio(self, mock_load, mock_generate, tmp_path):
+        """Test that --cache doesn't load the model up front, since every paragraph may be cached."""
+        input_file = tmp_path / "one.txt"
+        input_file.write_text("Hello.")
+
+        main([str(input_file), "--cache"])
+
+        mock_load.assert_not_called()
+        assert mock_generate.call_args.kwargs["model"] is None
+        assert mock_generate.call_args.kwargs["cache_dir"]
+
+    @patch('text_to_speech.load_tts_model')
+    def test_output_with_multiple_files_requires_merge(self, mock_load, tmp_path):
+        """Test that --output is rejected for several inputs without --merge."""
+        first = tmp_path / "one.txt"
+        second = tmp_path / "two.txt"
+        first.write_text("First file.")
+        second.write_text("Second file.")
+
+        with pytest.raises(SystemExit) as exc_info:
+            main([str(first), str(second), "--output", str(tmp_path / "out.wav")])
+
+        assert exc_info.value.code == 1
+        mock_load.assert_not_called()
+
+    @patch('text_to_speech.load_tts_model')
+    def test_empty_input_fails_before_model_load(self, mock_load, tmp_path):
+        """Test that an input with no speakable text is rejected without loading the model."""
+        first = tmp_path / "one.txt"
+        empty = tmp_path / "two.md"
+        first.write_text("First file.")
+        empty.write_text("  \n\n")
+
+        with pytest.raises(SystemExit) as exc_info:
+            main([str(first), str(empty)])
+
+        assert exc_info.value.code == 1
+        mock_load.assert_not_called()
+
+    @patch('text_to_speech.load_tts_model')
+    def test_punctuation_only_markdown_fails_before_model_load(self, mock_load, tmp_path):
+        """Test that markdown that cleans down to punctuation is rejected without loading the model."""
+        boilerplate = tmp_path / "links.md"
+        boilerplate.write_text("![banner](banner.png)\n\n---\n\n* * *\n")
+
+        with pytest.raises(SystemExit) as exc_info:
+            main([str(boilerplate)])
+
+        assert exc_info.value.code == 1
+        mock_load.assert_not_called()
+
+    def test_import_skips_heavy_dependencies(self):
+        """Test that importing the module doesn't import audio/model libraries."""
+        code = (
+            "import sys, text_to_speech; "
+            "print(sorted(m for m in ('numpy', 'soundfile', 'pydub', 'mlx_audio') if m in sys.modules))"
+        )
+        result = subprocess.run(
+            [sys.executable, "-c", code],
+            capture_output=True, text=True, check=True,
+            cwd=Path(__file__).parent.parent,
+        )
+        assert result.stdout.strip() == "[]"
+
+    @patch('text_to_speech.load_tts_model')
+    def test_missing_file_exits_before_loading_model(self, mock_load, tmp_path):
+        """Test that a missing input aborts before the model is loaded."""
+        existing = tmp_path / "one.txt"
+        existing.write_text("First file.")
+
+        with pytest.raises(SystemExit) as exc_info:
+            main([str(existing), str(tmp_path / "missing.txt")])
+
+        assert exc_info.value.code == 1
+        mock_load.assert_not_called()
 
 
 class TestIntegration:
@@ -0,0 +1,110 @@
+#!/usr/bin/env python3
+"""
+Unit tests for text_to_speech_server.py and the --use-daemon client.
+Run with: pytest tests/test_text_to_speech_server.py
+"""
+
+import os
+import shutil
+import socket
+import tempfile
+import threading
+from unittest.mock import patch, MagicMock
+
+import pytest
+
+from text_to_speech import generate_audio_via_daemon
+from text_to_speech_server import make_server
+
+
+@pytest.fixture
+def socket_path():
+    """A socket path short enough for AF_UNIX limits on macOS."""
+    directory = tempfile.mkdtemp(dir="/tmp")
+    yield os.path.join(directory, "tts.sock")
+    shutil.rmtree(directory)
+
+
+@pytest.fixture
+def running_server(socket_path):
+    """Serve requests with a mock model on a background thread."""
+    server = make_server(socket_path, MagicMock())
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    yield server
+    server.shutdown()
+    server.server_close()
+    thread.join()
+
+
+class TestDaemonClient:
+    """Test generate_audio_via_daemon against a running server."""
+
+    @patch('text_to_speech_server.generate_audio')
+    def test_request_reaches_generate_audio(self, mock_generate, running_server, socket_path):
+        """Test that the request is forwarded with the server's loaded model."""
+        assert generate_audio_via_daemon(
+            "Hello.", "out.wav", voice="af_bella", speed=1.2, lang="b",
+            socket_path=socket_path,
+        )
+
+        args, kwargs = mock_generate.call_args
+        assert args == ("Hello.", os.path.abspath("out.wav"))
+        assert kwargs["voice"] == "af_bella"
+        assert kwargs["speed"] == 1.2
+        assert kwargs["lang"] == "b"
+        assert kwargs["model"] is running_server.model
+
+    @patch('text_to_speech_server.generate_audio')
+    def test_server_error_is_raised(self, mock_generate, running_server, socket_path):
+        """Test that a failure on the server surfaces as a RuntimeError."""
+        mock_generate.side_effect = ValueError("Input text is empty")
+
+        with pytest.raises(RuntimeError, match="Input text is empty"):
+            generate_audio_via_daemon("", "out.wav", socket_path=socket_path)
+
+    @patch('text_to_speech_server.generate_audio')
+    def test_empty_connection_is_ignored(self, mock_generate, running_server, socket_path):
+        """Test that a connection that sends nothing (a liveness probe) is not a request."""
+        with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as probe:
+            probe.connect(socket_path)
+
+        assert generate_audio_via_daemon("Hello.", "out.wav", socket_path=socket_path)
+        assert mock_generate.call_count == 1
+
+    @patch('text_to_speech_server.generate_audio')
+    def test_other_model_is_refused(self, mock_generate, running_server, socket_path):
+        """Test that a request for a model the server doesn't have fails instead of using the wrong one."""
+        with pytest.raises(RuntimeError, match="mlx-community/Kokoro-82M-bf16"):
+            generate_audio_via_daemon(
+                "Hello.", "out.wav", model_name="mlx-community/Kokoro-82M-8bit",
+                socket_path=socket_path,
+            )
+
+        mock_generate.assert_not_called()
+
+    def test_no_server_returns_false(self, socket_path):
+        """Test that a missing server lets the caller fall back."""
+        assert generate_audio_via_daemon("Hello.", "out.wav", socket_path=socket_path) is False
+
+
+class TestMakeServer:
+    """Test the make_server function."""
+
+    def test_replaces_stale_socket_file(self, socket_path):
+        """Test that a socket left by a dead server is replaced."""
+        stale = make_server(socket_path)
+        stale.server_close()  # closes the socket but leaves the file
+        assert os.path.exists(socket_path)
+
+        server = make_server(socket_path)
+        server.server_close()
+
+    def test_refuses_second_live_server(self, running_server, socket_path):
+        """Test that a live server on the same path is not clobbered."""
+        with pytest.raises(RuntimeError, match="already listening"):
+            make_server(socket_path)
+
+
+if __name__ == "__main__":
+    pytest.main([__file__])
@@ -5,80 +5,204 @@ Converts text files (including Markdown) to audio using chunking for long texts.
 Optimized for Apple Silicon (M1/M2/M3/M4 Macs).
 """
 
+from __future__ import annotations
+
 import argparse
+import hashlib
+import json
+import mmap
 import sys
 import os
 import re
+import socket
 import tempfile
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from functools import lru_cache
+from itertools import groupby, islice
+from operator import itemgetter
 from pathlib import Path
-from typing import List
-import numpy as np
-import soundfile as sf
-from pydub import AudioSegment
+from typing import TYPE_CHECKING, Iterable, List
+
+if TYPE_CHECKING:
+    import numpy as np
+
+# numpy, soundfile and mlx_audio are imported inside the functions that use
+# them. They are slow to import (numpy alone is most of this module's import
+# time; mlx_audio pulls in libmlx and only imports on Apple Silicon at
+# all), and --help, --list-voices and tools like
+# verify_audio.py that only need the text helpers (e.g. split_sections)
+# shouldn't pay for them.
+
+DEFAULT_MODEL = "mlx-community/Kokoro-82M-bf16"  # see --model for quantized variants
+SAMPLE_RATE = 24000  # Kokoro output sample rate (Hz)
+CHUNK_PAUSE_MS = 300  # silence between chunks within a section
+SECTION_PAUSE_MS = 2000  # silence at each [BREAK] section boundary
+# Where text_to_speech_server.py listens for --use-daemon requests
+DEFAULT_SOCKET_PATH = os.path.join(tempfile.gettempdir(), "kokoro-reader.sock")
+# Where --cache keeps generated paragraphs, and how big it may grow
+# before the least recently used entries are evicted (~3 hours of audio)
+CACHE_DIR = os.path.join(os.path.expanduser("~"), ".cache", "kokoro-reader")
+CACHE_MAX_BYTES = 1 << 30
+
 
 try:
-    # mlx_audio only imports on Apple Silicon (it pulls in libmlx). Guard it so
-    # dependency-free helpers here (e.g. split_sections) can be imported by
-    # tools like verify_audio.py on any platform. The name stays bound for
-    # generate_audio and for tests that patch text_to_speech.load_model.
-    from mlx_audio.tts.utils import load_model
-except ImportError:  # pragma: no cover - exercised only off Apple Silicon
-    load_model = None
+    # google-re2 (optional) guarantees linear-time matching on any input.
+    # The patterns compiled with it stick to the syntax it shares with re
+    # (inline flags, no backreferences or lookarounds, and explicit classes
+    # like [0-9] where re's \d would also match non-ASCII digits), so
+    # either engine gives the same result.
+    import re2 as _re_engine
+except ImportError:
+    _re_engine = re
+
+# Markdown patterns used by clean_markdown_text, compiled once at import.
+# Every span is capped in length and may not cross a line break, link and
+# image parts may not contain '[', and code fences must open and close at
+# the start of a line, so stray `*`, `_`, brackets or backticks fail fast
+# instead of sending the engine scanning to the end of the document.
+_MARKDOWN_CHARS_RE = _re_engine.compile(
+    r'(?m)[#*_`\[>]|^[ \t]*(?:[-+]|[0-9]+\.)[ \t]'
+)  # any character or line prefix _MARKUP_RE could act on
+_CODE_BLOCK_RE = _re_engine.compile(r'(?ms)^```[^\n]*\n.*?^```')
+# Everything else is stripped in one pass: line prefixes (headers, list
+# markers, blockquotes), images, links, inline code, then bold and italic
+# emphasis; see _strip_markup_match. The patterns from here on always use
+# re: this one goes through a Python callback, which re2's wrapper makes
+# many times slower (and its counted alternation overflows RE2's DFA
+# memory), and the whitespace patterns need re's Unicode \s, where RE2's
+# only matches ASCII whitespace.
+_MARKUP_RE = re.compile(
+    r'(?m)(?P<prefix>^[ \t]*(?:(?:#{1,6}|[-*+]|[0-9]+\.|>)[ \t]+)+)'
+    r'|(?P<image>!\[[^\[\]\n]{0,500}\]\([^)\[\n]{1,500}\))'
+    r'|(?P<link>\[(?P<link_text>[^\[\]\n]{1,500})\]\((?P<link_target>[^)\[\n]{1,500})\))'
+    r'|(?P<ticks>`{1,3})(?P<code>[^`\n]{1,500})(?P=ticks)'
+    r'|\*\*(?P<strong>[^*\n]{1,500})\*\*'
+    r'|__(?P<strong_u>[^_\n]{1,500})__'
+    r'|\*(?P<em>[^*\n]{1,500})\*'
+    r'|_(?P<em_u>[^_\n]{1,500})_'
+)
+_LARGE_TEXT_CHARS = 50_000  # above this, markup is stripped paragraph by paragraph
+_BLANK_LINES_RE = re.compile(r'\n\s*\n')
+_SPACES_RE = re.compile(r' {2,}')  # single spaces need no replacing
+# Kokoro's default split_pattern: the model generates each line on its own,
+# so a paragraph's audio doesn't depend on its neighbours and can be cached.
+_PARAGRAPH_SPLIT_RE = re.compile(r'\n+')
+_EM_DASH_RE = re.compile(r'\s*--\s*')  # see prepare_for_tts
+_BREAK_RE = re.compile(r'\n*\[BREAK\]\n*')  # see split_sections
+
+# Files concatenate_audio_files decodes in parallel ahead of the writer
+_READ_AHEAD_WORKERS = 4
+
+# Byte-order marks checked by read_text_file before falling back to probing.
+_BOM_ENCODINGS = (
+    (b'\xef\xbb\xbf', 'utf-8-sig'),
+    (b'\xff\xfe', 'utf-16'),
+    (b'\xfe\xff', 'utf-16'),
+)
+# Files larger than this are decoded straight from a memory map
+_MMAP_MIN_BYTES = 10 * 1024 * 1024
 
 
 def read_text_file(file_path: str) -> str:
-    """Read text from file, handling various encodings."""
-    encodings = ['utf-8', 'utf-16', 'latin-1', 'ascii']
-    
-    for encoding in encodings:
+    """Read text from file, handling various encodings.
+
+    The file is read once; a byte-order mark picks the encoding directly,
+    otherwise UTF-8, UTF-16 and Latin-1 are tried in memory in that order.
+    Large files are memory-mapped instead of read, so decoding a book
+    doesn't also hold a bytes copy of it.
+    """
+    with open(file_path, 'rb') as f:
+        if os.fstat(f.fileno()).st_size > _MMAP_MIN_BYTES:
+            with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as raw:
+                return _decode_text(raw, file_path)
+        return _decode_text(f.read(), file_path)
+
+
+def _decode_text(raw, file_path: str) -> str:
+    """Decode raw (bytes or an mmap) as read_text_file describes."""
+    head = raw[:3]
+    for bom, encoding in _BOM_ENCODINGS:
+        if head.startswith(bom):
+            return _universal_newlines(str(raw, encoding))
+
+    # Latin-1 maps every byte, so the loop always returns by its last entry.
+    for encoding in ('utf-8', 'utf-16', 'latin-1'):
         try:
-            with open(file_path, 'r', encoding=encoding) as f:
-                return f.read()
+            return _universal_newlines(str(raw, encoding))
         except UnicodeDecodeError:
             continue
     
     raise ValueError(f"Could not decode file {file_path} with any supported encoding")
 
 
+def _universal_newlines(text: str) -> str:
+    """Translate \\r\\n and \\r line endings to \\n, as text-mode open() does."""
+    if '\r' not in text:
+        return text
+    return text.replace('\r\n', '\n').replace('\r', '\n')
+
+
 def clean_markdown_text(text: str) -> str:
     """Clean markdown formatting from text for better TTS."""
-    # Remove markdown headers
-    text = re.sub(r'^#{1,6}\s+', '', text, flags=re.MULTILINE)
-    
-    # Remove markdown images completely (including alt text)
-    text = re.sub(r'!\[([^\]]*)\]\([^\)]+\)', '', text)
-    
-    # Remove markdown links but keep the text (preserve Kokoro phonetic links like [word](/phonemes/))
-    text = re.sub(r'\[([^\]]+)\]\((?!/[^)]*?/\))[^\)]+\)', r'\1', text)
-    
-    # Remove markdown emphasis (bold/italic)
-    text = re.sub(r'\*{1,2}([^*]+)\*{1,2}', r'\1', text)
-    text = re.sub(r'_{1,2}([^_]+)_{1,2}', r'\1', text)
-    
-    # Remove code blocks and inline code
-    text = re.sub(r'```[^`]*```', '', text, flags=re.DOTALL)
-    text = re.sub(r'`([^`]+)`', r'\1', text)
-    
-    # Remove markdown lists
-    text = re.sub(r'^\s*[-*+]\s+', '', text, flags=re.MULTILINE)
-    text = re.sub(r'^\s*\d+\.\s+', '', text, flags=re.MULTILINE)
-    
-    # Remove blockquotes
-    text = re.sub(r'^\s*>\s+', '', text, flags=re.MULTILINE)
+    # Plain prose has nothing to strip, so only the whitespace cleanup runs.
+    if _MARKDOWN_CHARS_RE.search(text):
+        if '```' in text:
+            # Remove code blocks first, so their backticks aren't read as
+            # inline code (and before any paragraph split, since a block
+            # may contain blank lines)
+            text = _CODE_BLOCK_RE.sub('', text)
+        
+        if len(text) > _LARGE_TEXT_CHARS:
+            # Markdown links, emphasis and prefixes never span a blank line,
+            # so cleaning paragraph by paragraph keeps the result while
+            # bounding how far a stray '[' can make the link patterns scan.
+            text = '\n\n'.join(_strip_markup(part) for part in text.split('\n\n'))
+        else:
+            text = _strip_markup(text)
     
     # Clean up excessive whitespace
-    text = re.sub(r'\n\s*\n', '\n\n', text)
-    text = re.sub(r' +', ' ', text)
+    text = _BLANK_LINES_RE.sub('\n\n', text)
+    text = _SPACES_RE.sub(' ', text)
     
     return text.strip()
 
 
+def _strip_markup(text: str) -> str:
+    """Strip line prefixes, images, links, emphasis and inline code."""
+    return _MARKUP_RE.sub(_strip_markup_match, text)
+
+
+def _strip_markup_match(match: re.Match) -> str:
+    """Replacement for _MARKUP_RE, dispatching on which construct matched.
+
+    Prefixes and images are dropped and inline code is kept verbatim. Link
+    and emphasis text is cleaned again, so nested markup like **_bold
+    italic_** or [**bold link**](url) comes out in the same pass. Kokoro
+    phonetic overrides like [word](/phonemes/) are kept whole.
+    """
+    kind = match.lastgroup
+    if kind in ('prefix', 'image'):
+        return ''
+    if kind == 'code':
+        return match.group('code')
+    if kind == 'link':
+        target = match.group('link_target')
+        if len(target) > 1 and target.startswith('/') and target.endswith('/'):
+            return match.group(0)
+        inner = match.group('link_text')
+    else:
+        inner = match.group(kind)
+    return _MARKUP_RE.sub(_strip_markup_match, inner)
+
+
 def prepare_for_tts(text: str) -> str:
     """Prepare text for TTS by improving pause markers.
 
     Replaces -- em dashes with ... ellipsis for longer pauses in the TTS model.
     """
-    text = re.sub(r'\s*--\s*', '... ', text)
+    if '--' in text:
+        text = _EM_DASH_RE.sub('... ', text)
     return text
 
 
@@ -88,10 +212,48 @@ def split_sections(text: str) -> List[str]:
     Each section will be generated as a separate audio segment with
     longer silence between them.
     """
-    sections = re.split(r'\n*\[BREAK\]\n*', text)
+    sections = _BREAK_RE.split(text)
     return [s.strip() for s in sections if s.strip()]
 
 
+def _has_readable_text(text: str) -> bool:
+    """Return whether text has anything to speak: a letter or digit outside
+    the [BREAK] markers.
+
+    Inputs that clean down to punctuation alone (e.g. a markdown file of
+    horizontal rules and images) would otherwise only fail after the model
+    has loaded and generated nothing.
+    """
+    return any(c.isalnum() for section in split_sections(text) for c in section)
+
+
+def _to_wav_array(audio) -> np.ndarray:
+    """Convert a generated audio chunk to a contiguous 1-D float32 array.
+
+    The model hands back MLX arrays; this converts each one exactly once and
+    skips the copy when the input already is a float32 numpy array.
+    """
+    import numpy as np
+
+    return np.ascontiguousarray(audio, dtype=np.float32).reshape(-1)
+
+
+@lru_cache(maxsize=None)
+def load_tts_model(model_name: str = DEFAULT_MODEL):
+    """Load a Kokoro TTS model from the Hugging Face Hub (or a local path).
+
+    Loading takes seconds, so each model is loaded once per process and the
+    same instance is returned to every later caller.
+    """
+    try:
+        from mlx_audio.tts.utils import load_model
+    except ImportError as e:
+        raise RuntimeError(
+            "mlx_audio is unavailable (audio generation requires Apple Silicon)."
+        ) from e
+    return load_model(model_name)
+
+
 def generate_audio(
     text: str,
     output_path: str,
@@ -99,11 +261,17 @@ def generate_audio(
     speed: float = 1.0,
     lang: str = "a",
     keep_temp: bool = False,
+    model=None,
+    cache_dir: str = None,
+    model_name: str = DEFAULT_MODEL,
+    workers: int = 1,
+    chunk_pause_ms: int = CHUNK_PAUSE_MS,
 ) -> None:
     """Generate audio from text and save to a WAV file.
 
     Handles markdown cleaning, TTS preparation, section splitting,
-    chunk generation, and concatenation.
+    chunk generation, and concatenation. Generated chunks are streamed
+    into output_path as they arrive (see write_wav_stream).
 
     Args:
         text: Input text (may contain markdown, [BREAK] markers, phonetic links)
@@ -111,146 +279,500 @@ def generate_audio(
         voice: Voice to use for TTS
         speed: Speech speed multiplier
         lang: Language code
-        keep_temp: Whether to keep temporary chunk files
+        keep_temp: Whether to also write each chunk to a temporary WAV file
+                   (kept for debugging)
+        model: Already-loaded TTS model to reuse; loaded on demand if None
+        cache_dir: Directory for caching each paragraph's audio, or None to
+                   always generate (the model isn't loaded if every
+                   paragraph is already cached)
+        model_name: Model to load when model is None; also part of the
+                    cache key, so each model keeps its own entries
+        workers: Number of worker processes generating paragraphs in
+                 parallel, each with its own copy of model_name; with 1,
+                 generation runs in this process
+        chunk_pause_ms: Silence between chunks within a section
     """
     text = prepare_for_tts(text)
 
-    if not text.strip():
+    if not _has_readable_text(text):
         raise ValueError("Input text is empty or contains no readable text")
 
     sections = split_sections(text)
 
-    if load_model is None:
-        raise RuntimeError(
-            "mlx_audio is unavailable (audio generation requires Apple Silicon)."
+    if model is None and not cache_dir and workers <= 1:
+        model = load_tts_model(model_name)
+
+    import numpy as np
+    import soundfile as sf
+
+    # Chunks stream straight into the output file; they only touch disk
+    # separately when kept for debugging, and then on a writer thread so
+    # generation doesn't wait on the disk.
+    temp_dir = tempfile.mkdtemp(prefix="kokoro_tts_") if keep_temp else None
+    writer = ThreadPoolExecutor(max_workers=2) if temp_dir else None
+    pending_writes = []
+
+    def generated_audio(text):
+        nonlocal model
+        if model is None:
+            model = load_tts_model(model_name)
+        for result in model.generate(
+            text=text,
+            voice=voice,
+            speed=speed,
+            lang_code=lang,
+        ):
+            if result.audio is not None:
+                yield _to_wav_array(result.audio)
+
+    # With a cache or worker processes the unit of work is the paragraph
+    # (see _PARAGRAPH_SPLIT_RE); otherwise each section goes to the model whole.
+    pool = None
+    if workers > 1:
+        pool = ProcessPoolExecutor(
+            max_workers=workers, initializer=_load_worker_model, initargs=(model_name,)
         )
-    model = load_model("mlx-community/Kokoro-82M-bf16")
 
-    temp_dir = tempfile.mkdtemp(prefix="kokoro_tts_")
-    temp_files = []
-    section_breaks = set()
+    def paragraph_jobs():
+        """Yield (section_index, paragraph, cache_path) across the whole text."""
+        for index, section in enumerate(sections):
+            for paragraph in _PARAGRAPH_SPLIT_RE.split(section):
+                if not paragraph.strip():
+                    continue
+                cache_path = None
+                if cache_dir:
+                    cache_path = _cache_path(
+                        cache_dir, paragraph, voice, speed, lang, model_name, chunk_pause_ms
+                    )
+                yield index, paragraph, cache_path
+
+    # Paragraphs waiting to be written, oldest first. Uncached ones are
+    # submitted to the pool as they enter, so the workers run ahead of the
+    # writer (across section breaks too), but only this far: results are
+    # held in memory until written.
+    jobs = paragraph_jobs()
+    window = deque()
+    window_size = 2 * workers if pool else 1
+
+    def fill_window():
+        while len(window) < window_size:
+            job = next(jobs, None)
+            if job is None:
+                return
+            index, paragraph, cache_path = job
+            future = None
+            if pool and not (cache_path and os.path.exists(cache_path)):
+                future = pool.submit(_generate_in_worker, paragraph, voice, speed, lang)
+            window.append((index, paragraph, cache_path, future))
+
+    def paragraph_audio(index):
+        """Yield the audio of section index's paragraphs, in order."""
+        while True:
+            fill_window()
+            if not window or window[0][0] != index:
+                return
+            _, paragraph, cache_path, future = window.popleft()
+            fill_window()  # keep the workers busy while this one is written
+
+            if future is None and cache_path and os.path.exists(cache_path):
+                audio, _ = sf.read(cache_path, dtype='float32')
+                os.utime(cache_path)  # mark as recently used
+                yield audio
+                continue
+
+            chunks = []
+            generated = future.result() if future else generated_audio(paragraph)
+            future = None  # so each written chunk can be freed
+            for audio in generated:
+                if cache_path:
+                    chunks.append(audio)
+                yield audio
+            generated = None
+            if chunks:
+                # Stored with the pauses between its chunks, so a hit is a
+                # single chunk that writes out exactly the same samples
+                parts = [chunks[0]]
+                for audio in chunks[1:]:
+                    parts += [_silence(chunk_pause_ms), audio]
+                try:
+                    _write_cache_entry(cache_path, np.concatenate(parts))
+                except (OSError, sf.SoundFileError) as e:
+                    cache_errors.append(e)
+
+    chunk_count = 0
+    audio_seconds = 0.0
+    cache_errors = []
+
+    def section_audio(index, section):
+        nonlocal chunk_count, audio_seconds
+        by_paragraph = cache_dir or pool
+        for audio in paragraph_audio(index) if by_paragraph else generated_audio(section):
+            # Progress is reported as chunks arrive; counting them up front
+            # would mean running the text analysis twice.
+            chunk_count += 1
+            audio_seconds += len(audio) / SAMPLE_RATE
+            print(f"Generated chunk {chunk_count} ({audio_seconds:.0f}s of audio so far)", flush=True)
+            if writer:
+                chunk_path = os.path.join(temp_dir, f"chunk_{len(pending_writes):04d}.wav")
+                pending_writes.append(writer.submit(sf.write, chunk_path, audio, SAMPLE_RATE))
+            yield audio
+
+    if cache_dir:
+        try:
+            os.makedirs(cache_dir, exist_ok=True)
+        except OSError as e:
+            print(f"Warning: not caching, {cache_dir} is unusable ({e})", file=sys.stderr)
+            cache_dir = None
+    try:
+        write_wav_stream(
+            (section_audio(index, section) for index, section in enumerate(sections)),
+            output_path,
+            chunk_pause_ms,
+        )
+    finally:
+        if pool:
+            pool.shutdown(cancel_futures=True)
+        if writer:
+            writer.shutdown(wait=True)
+    if cache_dir:
+        try:
+            _prune_cache(cache_dir, CACHE_MAX_BYTES)
+        except OSError as e:
+            cache_errors.append(e)
+
+    # The cache and the debug copies are best-effort; the output is
+    # already written
+    if cache_errors:
+        print(
+            f"Warning: the cache could not be updated for {len(cache_errors)} "
+            f"paragraph(s) ({cache_errors[0]})",
+            file=sys.stderr,
+        )
+    failed = [future.exception() for future in pending_writes if future.exception()]
+    if failed:
+        print(
+            f"Warning: {len(failed)} of {len(pending_writes)} chunk files "
+            f"could not be written ({failed[0]})",
+            file=sys.stderr,
+        )
+    if temp_dir:
+        print(f"Chunk files kept in: {temp_dir}")
+
+
+# The model loaded by each --workers process (see _load_worker_model)
+_worker_model = None
+
 
+def _load_worker_model(model_name: str) -> None:
+    """ProcessPoolExecutor initializer: load the model once per worker."""
+    global _worker_model
+    _worker_model = load_tts_model(model_name)
+
+
+def _generate_in_worker(text: str, voice: str, speed: float, lang: str) -> List[np.ndarray]:
+    """Generate one paragraph's chunks with the worker's model."""
+    return [
+        _to_wav_array(result.audio)
+        for result in _worker_model.generate(text=text, voice=voice, speed=speed, lang_code=lang)
+        if result.audio is not None
+    ]
+
+
+def _cache_path(
+    cache_dir: str, paragraph: str, voice: str, speed: float, lang: str, model_name: str,
+    chunk_pause_ms: int,
+) -> str:
+    """Return the cache file for a paragraph rendered with these settings.
+
+    chunk_pause_ms is part of the key because entries hold the pauses
+    between a paragraph's chunks.
+    """
+    key = json.dumps([model_name, voice, speed, lang, chunk_pause_ms, paragraph]).encode()
+    return os.path.join(cache_dir, hashlib.blake2b(key, digest_size=16).hexdigest() + ".wav")
+
+
+def _write_cache_entry(cache_path: str, audio: np.ndarray) -> None:
+    """Save audio to the cache without ever exposing a half-written file.
+
+    On failure the temporary file is removed and the error re-raised.
+    """
+    import soundfile as sf
+
+    temp_path = f"{cache_path}.{os.getpid()}.tmp"
     try:
-        chunk_count = 0
-
-        for section_idx, section in enumerate(sections):
-            for result in model.generate(
-                text=section,
-                voice=voice,
-                speed=speed,
-                lang_code=lang,
-            ):
-                if result.audio is not None:
-                    chunk_path = os.path.join(temp_dir, f"chunk_{chunk_count:04d}.wav")
-                    sf.write(chunk_path, np.array(result.audio), 24000)
-                    temp_files.append(chunk_path)
-                    chunk_count += 1
+        sf.write(temp_path, audio, SAMPLE_RATE, subtype='FLOAT', format='WAV')
+        os.replace(temp_path, cache_path)
+    except BaseException:
+        try:
+            os.unlink(temp_path)
+        except FileNotFoundError:
+            pass
+        raise
+
+
+def _prune_cache(cache_dir: str, max_bytes: int) -> None:
+    """Delete the least recently used cache entries until the cache fits in max_bytes."""
+    entries = []
+    with os.scandir(cache_dir) as it:
+        for entry in it:
+            if entry.name.endswith('.wav'):
+                stat = entry.stat()
+                entries.append((stat.st_mtime, stat.st_size, entry.path))
+
+    total = sum(size for _, size, _ in entries)
+    for _, size, path in sorted(entries):
+        if total <= max_bytes:
+            break
+        try:
+            os.unlink(path)
+        except FileNotFoundError:
+            pass  # evicted by a concurrent run
+        total -= size
 
-            if section_idx < len(sections) - 1 and temp_files:
-                section_breaks.add(chunk_count - 1)
 
-        if not temp_files:
-            raise RuntimeError("No audio was generated")
+def generate_audio_via_daemon(
+    text: str,
+    output_path: str,
+    voice: str = "af_heart",
+    speed: float = 1.0,
+    lang: str = "a",
+    keep_temp: bool = False,
+    cache_dir: str = None,
+    model_name: str = DEFAULT_MODEL,
+    chunk_pause_ms: int = CHUNK_PAUSE_MS,
+    socket_path: str = DEFAULT_SOCKET_PATH,
+) -> bool:
+    """Ask a running text_to_speech_server.py to generate audio.
+
+    The server already has the model loaded, so this skips the load time
+    entirely. It writes output_path itself; the path is sent as absolute
+    since the server may run from another directory.
+
+    Returns:
+        True once the audio is written, or False if no server is listening
+        (the caller should then generate in-process)
+
+    Raises:
+        RuntimeError: If the server reports an error, including having a
+                      different model than model_name loaded
+    """
+    request = {
+        "text": text,
+        "output": os.path.abspath(output_path),
+        "voice": voice,
+        "speed": speed,
+        "lang": lang,
+        "keep_temp": keep_temp,
+        "cache_dir": cache_dir,
+        "model": model_name,
+        "chunk_pause_ms": chunk_pause_ms,
+    }
+    with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as sock:
+        try:
+            sock.connect(socket_path)
+        except (FileNotFoundError, ConnectionRefusedError):
+            return False
+        sock.sendall(json.dumps(request).encode() + b"\n")
+        with sock.makefile("rb") as reply:
+            response = json.loads(reply.readline() or b"{}")
 
-        concatenate_audio_files(temp_files, output_path, section_breaks=section_breaks)
+    if "error" in response or not response.get("ok"):
+        raise RuntimeError(f"TTS server: {response.get('error', 'no response')}")
+    return True
 
-    finally:
-        if not keep_temp:
-            for temp_file in temp_files:
-                try:
-                    os.unlink(temp_file)
-                except OSError:
-                    pass
-            try:
-                os.rmdir(temp_dir)
-            except OSError:
-                pass
+
+def write_wav_stream(
+    sections: Iterable[Iterable[np.ndarray]],
+    output_path: str,
+    chunk_pause_ms: int = CHUNK_PAUSE_MS,
+) -> int:
+    """Write audio chunks to a WAV file as they arrive.
+
+    The file is opened on the first chunk and each chunk is appended
+    together with the pause before it, so memory use doesn't grow with the
+    length of the recording. Pauses only go between chunks; the recording
+    ends with the last chunk. If writing fails part-way, the incomplete
+    file is removed.
+
+    Args:
+        sections: Iterable of sections, each an iterable of 1-D float32
+                  sample arrays at SAMPLE_RATE
+        output_path: Path for the output WAV file
+        chunk_pause_ms: Silence between chunks within a section
+
+    Returns:
+        Number of chunks written
+
+    Raises:
+        RuntimeError: If no section produced any audio
+    """
+    import soundfile as sf
+
+    out = None
+    pause = None
+    chunk_count = 0
+    try:
+        for section in sections:
+            for audio in section:
+                if out is None:
+                    out = sf.SoundFile(
+                        output_path, 'w', samplerate=SAMPLE_RATE, channels=1, subtype='PCM_16'
+                    )
+                else:
+                    out.write(pause)
+                out.write(audio)
+                pause = _silence(chunk_pause_ms)
+                chunk_count += 1
+            if out is not None:
+                pause = _silence(SECTION_PAUSE_MS)
+
+        if out is None:
+            raise RuntimeError("No audio was generated")
+    except BaseException:
+        if out is not None:
+            out.close()
+            os.unlink(output_path)
+        raise
+    out.close()
+    return chunk_count
+
+
+@lru_cache(maxsize=None)
+def _silence(duration_ms: int) -> np.ndarray:
+    """Return a shared, read-only block of silence of the given length."""
+    import numpy as np
+
+    silence = np.zeros(SAMPLE_RATE * duration_ms // 1000, dtype=np.float32)
+    silence.flags.writeable = False
+    return silence
+
+
+# Kokoro voices as (language, gender, voice), grouped by language then gender
+_VOICES = (
+    ('American English (lang: a)', 'Female', 'af_alloy'),
+    ('American English (lang: a)', 'Female', 'af_aoede'),
+    ('American English (lang: a)', 'Female', 'af_bella'),
+    ('American English (lang: a)', 'Female', 'af_heart'),
+    ('American English (lang: a)', 'Female', 'af_jessica'),
+    ('American English (lang: a)', 'Female', 'af_kore'),
+    ('American English (lang: a)', 'Female', 'af_nicole'),
+    ('American English (lang: a)', 'Female', 'af_nova'),
+    ('American English (lang: a)', 'Female', 'af_river'),
+    ('American English (lang: a)', 'Female', 'af_sarah'),
+    ('American English (lang: a)', 'Female', 'af_sky'),
+    ('American English (lang: a)', 'Male', 'am_adam'),
+    ('American English (lang: a)', 'Male', 'am_echo'),
+    ('American English (lang: a)', 'Male', 'am_eric'),
+    ('American English (lang: a)', 'Male', 'am_fenrir'),
+    ('American English (lang: a)', 'Male', 'am_liam'),
+    ('American English (lang: a)', 'Male', 'am_michael'),
+    ('American English (lang: a)', 'Male', 'am_onyx'),
+    ('American English (lang: a)', 'Male', 'am_puck'),
+    ('American English (lang: a)', 'Male', 'am_santa'),
+    ('British English (lang: b)', 'Female', 'bf_alice'),
+    ('British English (lang: b)', 'Female', 'bf_emma'),
+    ('British English (lang: b)', 'Female', 'bf_isabella'),
+    ('British English (lang: b)', 'Female', 'bf_lily'),
+    ('British English (lang: b)', 'Male', 'bm_daniel'),
+    ('British English (lang: b)', 'Male', 'bm_fable'),
+    ('British English (lang: b)', 'Male', 'bm_george'),
+    ('British English (lang: b)', 'Male', 'bm_lewis'),
+    ('Spanish (lang: e)', 'Female', 'ef_dora'),
+    ('Spanish (lang: e)', 'Male', 'em_alex'),
+    ('Spanish (lang: e)', 'Male', 'em_santa'),
+    ('French (lang: f)', 'Female', 'ff_siwis'),
+    ('Hindi (lang: h)', 'Female', 'hf_alpha'),
+    ('Hindi (lang: h)', 'Female', 'hf_beta'),
+    ('Hindi (lang: h)', 'Male', 'hm_omega'),
+    ('Hindi (lang: h)', 'Male', 'hm_psi'),
+    ('Italian (lang: i)', 'Female', 'if_sara'),
+    ('Italian (lang: i)', 'Male', 'im_nicola'),
+    ('Japanese (lang: j)', 'Female', 'jf_alpha'),
+    ('Japanese (lang: j)', 'Female', 'jf_gongitsune'),
+    ('Japanese (lang: j)', 'Female', 'jf_nezumi'),
+    ('Japanese (lang: j)', 'Female', 'jf_tebukuro'),
+    ('Japanese (lang: j)', 'Male', 'jm_kumo'),
+    ('Portuguese (lang: p)', 'Female', 'pf_dora'),
+    ('Portuguese (lang: p)', 'Male', 'pm_alex'),
+    ('Portuguese (lang: p)', 'Male', 'pm_santa'),
+    ('Chinese (lang: z)', 'Female', 'zf_xiaobei'),
+    ('Chinese (lang: z)', 'Female', 'zf_xiaoni'),
+    ('Chinese (lang: z)', 'Female', 'zf_xiaoxiao'),
+    ('Chinese (lang: z)', 'Female', 'zf_xiaoyi'),
+    ('Chinese (lang: z)', 'Male', 'zm_yunjian'),
+    ('Chinese (lang: z)', 'Male', 'zm_yunxi'),
+    ('Chinese (lang: z)', 'Male', 'zm_yunxia'),
+    ('Chinese (lang: z)', 'Male', 'zm_yunyang'),
+)
 
 
 def list_available_voices():
     """List all available voices organized by language."""
-    voices = {
-        'American English (lang: a)': {
-            'Female': ['af_alloy', 'af_aoede', 'af_bella', 'af_heart', 'af_jessica', 
-                      'af_kore', 'af_nicole', 'af_nova', 'af_river', 'af_sarah', 'af_sky'],
-            'Male': ['am_adam', 'am_echo', 'am_eric', 'am_fenrir', 'am_liam', 
-                    'am_michael', 'am_onyx', 'am_puck', 'am_santa']
-        },
-        'British English (lang: b)': {
-            'Female': ['bf_alice', 'bf_emma', 'bf_isabella', 'bf_lily'],
-            'Male': ['bm_daniel', 'bm_fable', 'bm_george', 'bm_lewis']
-        },
-        'Spanish (lang: e)': {
-            'Female': ['ef_dora'],
-            'Male': ['em_alex', 'em_santa']
-        },
-        'French (lang: f)': {
-            'Female': ['ff_siwis'],
-            'Male': []
-        },
-        'Hindi (lang: h)': {
-            'Female': ['hf_alpha', 'hf_beta'],
-            'Male': ['hm_omega', 'hm_psi']
-        },
-        'Italian (lang: i)': {
-            'Female': ['if_sara'],
-            'Male': ['im_nicola']
-        },
-        'Japanese (lang: j)': {
-            'Female': ['jf_alpha', 'jf_gongitsune', 'jf_nezumi', 'jf_tebukuro'],
-            'Male': ['jm_kumo']
-        },
-        'Portuguese (lang: p)': {
-            'Female': ['pf_dora'],
-            'Male': ['pm_alex', 'pm_santa']
-        },
-        'Chinese (lang: z)': {
-            'Female': ['zf_xiaobei', 'zf_xiaoni', 'zf_xiaoxiao', 'zf_xiaoyi'],
-            'Male': ['zm_yunjian', 'zm_yunxi', 'zm_yunxia', 'zm_yunyang']
-        }
-    }
-    
-    print("Available Voices by Language:\n")
-    for language, genders in voices.items():
-        print(f"🗣️  {language}")
-        for gender, voice_list in genders.items():
-            if voice_list:
-                print(f"   {gender}: {', '.join(voice_list)}")
-        print()
-    
-    print("Usage: python text_to_speech.py document.txt --voice VOICE_NAME --lang LANG_CODE")
-    print("Example: python text_to_speech.py document.txt --voice af_bella --lang a")
+    lines = ["Available Voices by Language:", ""]
+    for language, rows in groupby(_VOICES, key=itemgetter(0)):
+        lines.append(f"🗣️  {language}")
+        for gender, voices in groupby(rows, key=itemgetter(1)):
+            lines.append(f"   {gender}: {', '.join(voice for _, _, voice in voices)}")
+        lines.append("")
+    lines.append("Usage: python text_to_speech.py document.txt --voice VOICE_NAME --lang LANG_CODE")
+    lines.append("Example: python text_to_speech.py document.txt --voice af_bella --lang a")
+    print("\n".join(lines))
 
 
 def concatenate_audio_files(audio_files: List[str], output_path: str, section_breaks: set = None) -> None:
     """Concatenate multiple audio files into one.
 
+    generate_audio no longer writes chunk files, so this is a thin wrapper
+    over write_wav_stream for callers that still have them. A few files
+    are decoded ahead on worker threads (libsndfile releases the GIL) while
+    earlier ones are written, so memory stays bounded by the read-ahead.
+
     Args:
-        audio_files: List of WAV file paths to concatenate
+        audio_files: List of WAV file paths to concatenate (at SAMPLE_RATE)
         output_path: Path for the output file
         section_breaks: Set of chunk indices after which to insert a longer
                        section pause (2s) instead of the normal inter-chunk pause (300ms)
     """
+    import soundfile as sf
+
     if not audio_files:
         raise ValueError("No audio files to concatenate")
 
     if section_breaks is None:
         section_breaks = set()
 
-    combined = AudioSegment.empty()
-
-    for i, audio_file in enumerate(audio_files):
-        audio = AudioSegment.from_wav(audio_file)
-        combined += audio
-        if i in section_breaks:
-            combined += AudioSegment.silent(duration=2000)  # 2s section pause
-        else:
-            combined += AudioSegment.silent(duration=300)  # 300ms chunk pause
-    
-    combined.export(output_path, format="wav")
+    def read(path):
+        audio, _ = sf.read(path, dtype='float32')
+        return _to_wav_array(audio)
+
+    def read_ahead():
+        with ThreadPoolExecutor(max_workers=_READ_AHEAD_WORKERS) as pool:
+            pending = deque()
+            for path in audio_files:
+                pending.append(pool.submit(read, path))
+                if len(pending) > 2 * _READ_AHEAD_WORKERS:
+                    yield pending.popleft().result()
+            while pending:
+                yield pending.popleft().result()
+
+    section_sizes = []
+    start = 0
+    for i in range(len(audio_files)):
+        if i in section_breaks or i == len(audio_files) - 1:
+            section_sizes.append(i + 1 - start)
+            start = i + 1
+
+    # write_wav_stream drains each section before starting the next, so the
+    # sections can share one in-order stream of decoded files.
+    chunks = read_ahead()
+    try:
+        write_wav_stream((islice(chunks, size) for size in section_sizes), output_path)
+    finally:
+        chunks.close()
 
 
-def main():
+def main(argv=None):
+    """CLI entry point for text-to-speech conversion."""
     parser = argparse.ArgumentParser(
         description="Convert text files to speech using MLX Audio (Apple Silicon optimized)",
         formatter_class=argparse.RawDescriptionHelpFormatter,
@@ -258,14 +780,16 @@ def main():
 Examples:
   python text_to_speech.py document.txt
   python text_to_speech.py README.md --voice af_bella --output my_audio.wav
+  python text_to_speech.py part1.md part2.md part3.md
+  python text_to_speech.py part1.md part2.md --merge --output book.wav
   python text_to_speech.py --help
         """
     )
     
     parser.add_argument(
         "input_file",
-        nargs="?",
-        help="Input text file (supports .txt, .md, and other text formats). Use '-' or omit to read from stdin."
+        nargs="*",
+        help="Input text file(s) (supports .txt, .md, and other text formats). Use '-' or omit to read from stdin."
     )
     
     parser.add_argument(
@@ -292,10 +816,49 @@ Examples:
         help="Language code (a=American English, b=British English, etc.)"
     )
     
+    parser.add_argument(
+        "--model",
+        default=DEFAULT_MODEL,
+        help=f"Kokoro model to load, e.g. mlx-community/Kokoro-82M-8bit for a smaller, "
+             f"faster quantized variant (default: {DEFAULT_MODEL})"
+    )
+    
+    parser.add_argument(
+        "--workers",
+        type=int,
+        default=1,
+        help="Generate paragraphs in this many parallel processes, each loading its own model (default: 1)"
+    )
+    
+    parser.add_argument(
+        "--chunk-pause-ms",
+        type=int,
+        default=CHUNK_PAUSE_MS,
+        help=f"Milliseconds of silence between chunks; 0 for none (default: {CHUNK_PAUSE_MS})"
+    )
+    
+    parser.add_argument(
+        "--merge",
+        action="store_true",
+        help="Combine all input files into one recording, with a section pause between files"
+    )
+    
+    parser.add_argument(
+        "--use-daemon",
+        action="store_true",
+        help="Send the work to a running text_to_speech_server.py (falls back to loading the model here)"
+    )
+    
     parser.add_argument(
         "--keep-temp",
         action="store_true",
-        help="Keep temporary audio chunk files for debugging"
+        help="Also write each audio chunk to a temporary directory for debugging"
+    )
+    
+    parser.add_argument(
+        "--cache",
+        action="store_true",
+        help=f"Reuse audio for paragraphs generated before with the same settings (kept in {CACHE_DIR})"
     )
     
     parser.add_argument(
@@ -310,7 +873,7 @@ Examples:
         help="Treat input as markdown and clean formatting (auto-detected for .md/.markdown files)"
     )
     
-    args = parser.parse_args()
+    args = parser.parse_args(argv)
     
     # Handle --list-voices option
     if args.list_voices:
@@ -318,11 +881,34 @@ Examples:
         sys.exit(0)
 
     # Determine if reading from stdin
-    reading_from_stdin = not args.input_file or args.input_file == '-'
+    input_files = args.input_file or ['-']
+    reading_from_stdin = input_files == ['-']
+    
+    if not reading_from_stdin and '-' in input_files:
+        print("Error: '-' (stdin) can't be combined with other input files.", file=sys.stderr)
+        sys.exit(1)
     
     # Validate input
-    if not reading_from_stdin and not os.path.exists(args.input_file):
-        print(f"Error: Input file '{args.input_file}' not found.", file=sys.stderr)
+    if not reading_from_stdin:
+        for input_file in input_files:
+            if not os.path.exists(input_file):
+                print(f"Error: Input file '{input_file}' not found.", file=sys.stderr)
+                sys.exit(1)
+    
+    if args.workers < 1:
+        print("Error: --workers must be at least 1.", file=sys.stderr)
+        sys.exit(1)
+    
+    if args.workers > 1 and args.use_daemon:
+        print("Error: --workers can't be combined with --use-daemon.", file=sys.stderr)
+        sys.exit(1)
+    
+    if args.chunk_pause_ms < 0:
+        print("Error: --chunk-pause-ms can't be negative.", file=sys.stderr)
+        sys.exit(1)
+    
+    if args.output and len(input_files) > 1 and not args.merge:
+        print("Error: --output needs a single input file (or --merge).", file=sys.stderr)
         sys.exit(1)
     
     # Check if stdin has data when reading from stdin
@@ -334,39 +920,72 @@ Examples:
         print("  head -n 10 document.txt | python text_to_speech.py")
         sys.exit(1)
     
-    # Determine output path
-    if args.output:
-        output_path = args.output
-    elif reading_from_stdin:
-        output_path = "output.wav"
-    else:
-        input_path = Path(args.input_file)
-        output_path = str(input_path.with_suffix('.wav'))
-    
     try:
-        # Read and clean the text
+        # Read and clean the text, pairing each with its output path
+        jobs = []
         if reading_from_stdin:
             print("Reading from stdin...")
             text = sys.stdin.read()
-            is_markdown = args.markdown
+            if args.markdown:
+                print("Cleaning markdown formatting...")
+                text = clean_markdown_text(text)
+            jobs.append((text, args.output or "output.wav"))
         else:
-            print("Reading input file...")
-            text = read_text_file(args.input_file)
-            is_markdown = args.markdown or args.input_file.lower().endswith(('.md', '.markdown'))
+            for input_file in input_files:
+                print(f"Reading {input_file}...")
+                text = read_text_file(input_file)
+                
+                # Clean markdown if specified or auto-detected
+                if args.markdown or input_file.lower().endswith(('.md', '.markdown')):
+                    print("Cleaning markdown formatting...")
+                    text = clean_markdown_text(text)
+                
+                jobs.append((text, args.output or str(Path(input_file).with_suffix('.wav'))))
         
-        # Clean markdown if specified or auto-detected
-        if is_markdown:
-            print("Cleaning markdown formatting...")
-            text = clean_markdown_text(text)
-
-        generate_audio(
-            text, output_path,
-            voice=args.voice,
-            speed=args.speed,
-            lang=args.lang,
-            keep_temp=args.keep_temp,
-        )
-        print(f"Audio saved to: {output_path}")
+        if args.merge and len(jobs) > 1:
+            text = "\n\n[BREAK]\n\n".join(text for text, _ in jobs)
+            jobs = [(text, args.output or "output.wav")]
+        
+        # Reject empty inputs before paying for the model load
+        for text, output_path in jobs:
+            if not _has_readable_text(text):
+                raise ValueError(f"Input text for {output_path} is empty or contains no readable text")
+        
+        # Load the model at most once and reuse it for every output; with
+        # --cache it's left to generate_audio, which only loads it on a miss
+        model = None
+        cache_dir = CACHE_DIR if args.cache else None
+        for text, output_path in jobs:
+            if args.use_daemon and generate_audio_via_daemon(
+                text, output_path,
+                voice=args.voice,
+                speed=args.speed,
+                lang=args.lang,
+                keep_temp=args.keep_temp,
+                cache_dir=cache_dir,
+                model_name=args.model,
+                chunk_pause_ms=args.chunk_pause_ms,
+            ):
+                print(f"Audio saved to: {output_path}")
+                continue
+            
+            if model is None and args.workers == 1 and not args.cache:
+                if args.use_daemon:
+                    print("No TTS server running; loading the model here...")
+                model = load_tts_model(args.model)
+            generate_audio(
+                text, output_path,
+                voice=args.voice,
+                speed=args.speed,
+                lang=args.lang,
+                keep_temp=args.keep_temp,
+                model=model,
+                cache_dir=cache_dir,
+                model_name=args.model,
+                workers=args.workers,
+                chunk_pause_ms=args.chunk_pause_ms,
+            )
+            print(f"Audio saved to: {output_path}")
     
     except Exception as e:
         print(f"Error: {e}", file=sys.stderr)
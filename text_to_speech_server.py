@@ -0,0 +1,125 @@
+#!/usr/bin/env python3
+"""
+Keep the Kokoro TTS model loaded between text_to_speech.py runs.
+
+Loads the model once and serves generation requests over a Unix socket,
+so `text_to_speech.py --use-daemon` skips the multi-second model load.
+Requests are handled one at a time; each is a single line of JSON and
+gets a single line of JSON back.
+"""
+
+import argparse
+import json
+import os
+import socket
+import socketserver
+import sys
+
+from text_to_speech import (
+    CHUNK_PAUSE_MS, DEFAULT_MODEL, DEFAULT_SOCKET_PATH, generate_audio, load_tts_model,
+)
+
+
+class _RequestHandler(socketserver.StreamRequestHandler):
+    """Generate audio for one request and report the outcome."""
+
+    def handle(self):
+        line = self.rfile.readline()
+        if not line:
+            return  # a liveness probe from make_server, not a request
+        try:
+            request = json.loads(line)
+            model_name = request.get("model", DEFAULT_MODEL)
+            if model_name != self.server.model_name:
+                raise ValueError(
+                    f"this server has {self.server.model_name} loaded, not {model_name}"
+                )
+            generate_audio(
+                request["text"], request["output"],
+                voice=request.get("voice", "af_heart"),
+                speed=request.get("speed", 1.0),
+                lang=request.get("lang", "a"),
+                keep_temp=request.get("keep_temp", False),
+                cache_dir=request.get("cache_dir"),
+                model=self.server.model,
+                model_name=model_name,
+                chunk_pause_ms=request.get("chunk_pause_ms", CHUNK_PAUSE_MS),
+            )
+            print(f"Audio saved to: {request['output']}")
+            response = {"ok": True}
+        except Exception as e:
+            print(f"Error: {e}", file=sys.stderr)
+            response = {"error": str(e)}
+        try:
+            self.wfile.write(json.dumps(response).encode() + b"\n")
+        except BrokenPipeError:
+            pass  # the client went away; the audio is already written
+
+
+def make_server(
+    socket_path: str, model=None, model_name: str = DEFAULT_MODEL
+) -> socketserver.UnixStreamServer:
+    """Bind a server on socket_path that generates audio with model.
+
+    model_name says which model that is; requests asking for a different
+    one are refused rather than silently rendered with the wrong model.
+
+    The model can also be assigned to server.model after binding, which
+    lets a conflicting server be reported before the slow model load.
+
+    A socket file left behind by a server that didn't shut down cleanly is
+    replaced; one that still has a live server behind it is an error.
+
+    Raises:
+        RuntimeError: If another server is already listening on socket_path
+    """
+    if os.path.exists(socket_path):
+        try:
+            with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as probe:
+                probe.connect(socket_path)
+        except ConnectionRefusedError:
+            os.unlink(socket_path)
+        else:
+            raise RuntimeError(f"A TTS server is already listening on {socket_path}")
+
+    server = socketserver.UnixStreamServer(socket_path, _RequestHandler)
+    server.model = model
+    server.model_name = model_name
+    return server
+
+
+def main(argv=None):
+    """CLI entry point for the TTS server."""
+    parser = argparse.ArgumentParser(
+        description="Keep the Kokoro model loaded and serve text_to_speech.py --use-daemon requests"
+    )
+    parser.add_argument(
+        "--model",
+        default=DEFAULT_MODEL,
+        help=f"Kokoro model to keep loaded; clients must pass the same --model (default: {DEFAULT_MODEL})"
+    )
+    args = parser.parse_args(argv)
+
+    try:
+        server = make_server(DEFAULT_SOCKET_PATH, model_name=args.model)
+    except Exception as e:
+        print(f"Error: {e}", file=sys.stderr)
+        sys.exit(1)
+
+    try:
+        with server:
+            print("Loading model...")
+            server.model = load_tts_model(args.model)
+            print(f"Listening on {DEFAULT_SOCKET_PATH} (Ctrl-C to stop)")
+            server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    except Exception as e:
+        print(f"Error: {e}", file=sys.stderr)
+        sys.exit(1)
+    finally:
+        os.unlink(DEFAULT_SOCKET_PATH)
+
+
+if __name__ == "__main__":
+    main()